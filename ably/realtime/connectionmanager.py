@@ -85,28 +85,39 @@ class ConnectionManager(EventEmitter):
         self.notify_state(ConnectionState.CLOSED)
 
     async def send_protocol_message(self, protocol_message: dict) -> None:
+        transport = self.__get_send_transport(protocol_message)
+        if transport:
+            await transport.send(protocol_message)
+
+    def send_protocol_message_nowait(self, protocol_message: dict) -> None:
+        """Hands the message to the transport's writer queue without waiting for it to be sent"""
+        transport = self.__get_send_transport(protocol_message)
+        if transport:
+            transport.send_nowait(protocol_message)
+
+    def __get_send_transport(self, protocol_message: dict) -> Optional[WebSocketTransport]:
         if self.state in (
             ConnectionState.DISCONNECTED,
             ConnectionState.CONNECTING,
         ):
             self.queued_messages.put(protocol_message)
-            return
+            return None
 
         if self.state == ConnectionState.CONNECTED:
-            if self.transport:
-                await self.transport.send(protocol_message)
-            else:
+            if not self.transport:
                 log.exception(
                     "ConnectionManager.send_protocol_message(): can not send message with no active transport"
                 )
-            return
+            return self.transport
 
         raise AblyException(f"ConnectionManager.send_protocol_message(): called in {self.state}", 500, 50000)
 
     def send_queued_messages(self) -> None:
         log.info(f'ConnectionManager.send_queued_messages(): sending {self.queued_messages.qsize()} message(s)')
-        while not self.queued_messages.empty():
-            asyncio.create_task(self.send_protocol_message(self.queued_messages.get()))
+        # Only the messages queued so far are sent; a transport that can no longer write puts them back on
+        # this queue, so draining it until empty would never finish
+        for _ in range(self.queued_messages.qsize()):
+            self.send_protocol_message_nowait(self.queued_messages.get())
 
     def fail_queued_messages(self, err) -> None:
         log.info(
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import asyncio
 import logging
+from itertools import groupby
+from operator import attrgetter
 from typing import Optional, TYPE_CHECKING
 from ably.realtime.connection import ConnectionState
 from ably.transport.websockettransport import ProtocolMessageAction
@@ -10,13 +12,31 @@ from ably.types.flags import Flag, has_flag
 from ably.types.message import Message
 from ably.util.eventemitter import EventEmitter
 from ably.util.exceptions import AblyException
-from ably.util.helper import Timer, is_callable_or_coroutine
+from ably.util.helper import is_callable_or_coroutine
 
 if TYPE_CHECKING:
     from ably.realtime.realtime import AblyRealtime
 
 log = logging.getLogger(__name__)
 
+# RTL4b
+_ATTACHABLE_CONNECTION_STATES = frozenset(
+    (ConnectionState.CONNECTING, ConnectionState.CONNECTED, ConnectionState.DISCONNECTED)
+)
+# RTL5g, RTL5b
+_UNDETACHABLE_CONNECTION_STATES = frozenset((ConnectionState.CLOSING, ConnectionState.FAILED))
+# RTL5a
+_ALREADY_DETACHED_STATES = frozenset((ChannelState.INITIALIZED, ChannelState.DETACHED))
+# RTL4j1
+_CLEAR_ATTACH_RESUME_STATES = frozenset((ChannelState.DETACHING, ChannelState.FAILED))
+# RTP5a1
+_CLEAR_CHANNEL_SERIAL_STATES = frozenset((ChannelState.DETACHED, ChannelState.SUSPENDED, ChannelState.FAILED))
+
+# Plain int values used when building outbound protocol messages, which avoids enum lookups per message
+_ATTACH_ACTION = int(ProtocolMessageAction.ATTACH)
+_DETACH_ACTION = int(ProtocolMessageAction.DETACH)
+_ATTACH_RESUME_FLAG = int(Flag.ATTACH_RESUME)
+
 
 class RealtimeChannel(EventEmitter, Channel):
     """
@@ -47,14 +67,24 @@ class RealtimeChannel(EventEmitter, Channel):
         EventEmitter.__init__(self)
         self.__name = name
         self.__realtime = realtime
+        # The connection manager is created with the connection, before any channel, and never replaced
+        self.__connection_manager = realtime.connection.connection_manager
         self.__state = ChannelState.INITIALIZED
         self.__message_emitter = EventEmitter()
-        self.__state_timer: Optional[Timer] = None
+        self.__state_timer: Optional[asyncio.TimerHandle] = None
         self.__attach_resume = False
         self.__channel_serial: Optional[str] = None
-        self.__retry_timer: Optional[Timer] = None
+        self.__retry_timer: Optional[asyncio.TimerHandle] = None
         self.__error_reason: Optional[AblyException] = None
 
+        # Inbound protocol message handlers keyed by the raw integer action decoded from the wire
+        self.__action_handlers = {
+            int(ProtocolMessageAction.ATTACHED): self._handle_attached,
+            int(ProtocolMessageAction.DETACHED): self._handle_detached,
+            int(ProtocolMessageAction.MESSAGE): self._handle_message,
+            int(ProtocolMessageAction.ERROR): self._handle_error,
+        }
+
         # Used to listen to state changes internally, if we use the public event emitter interface then internals
         # will be disrupted if the user called .off() to remove all listeners
         self.__internal_state_emitter = EventEmitter()
@@ -74,7 +104,7 @@ class RealtimeChannel(EventEmitter, Channel):
             If unable to attach channel
         """
 
-        log.info(f'RealtimeChannel.attach() called, channel = {self.name}')
+        log.info('RealtimeChannel.attach() called, channel = %s', self.name)
 
         # RTL4a - if channel is attached do nothing
         if self.state == ChannelState.ATTACHED:
@@ -83,11 +113,7 @@ class RealtimeChannel(EventEmitter, Channel):
         self.__error_reason = None
 
         # RTL4b
-        if self.__realtime.connection.state not in [
-            ConnectionState.CONNECTING,
-            ConnectionState.CONNECTED,
-            ConnectionState.DISCONNECTED
-        ]:
+        if self.__realtime.connection.state not in _ATTACHABLE_CONNECTION_STATES:
             raise AblyException(
                 message=f"Unable to attach; channel state = {self.state}",
                 code=90001,
@@ -107,12 +133,12 @@ class RealtimeChannel(EventEmitter, Channel):
 
         # RTL4c
         attach_msg = {
-            "action": ProtocolMessageAction.ATTACH,
-            "channel": self.name,
+            "action": _ATTACH_ACTION,
+            "channel": self.__name,
         }
 
         if self.__attach_resume:
-            attach_msg["flags"] = Flag.ATTACH_RESUME
+            attach_msg["flags"] = _ATTACH_RESUME_FLAG
         if self.__channel_serial:
             attach_msg["channelSerial"] = self.__channel_serial
 
@@ -132,10 +158,10 @@ class RealtimeChannel(EventEmitter, Channel):
             If unable to detach channel
         """
 
-        log.info(f'RealtimeChannel.detach() called, channel = {self.name}')
+        log.info('RealtimeChannel.detach() called, channel = %s', self.name)
 
         # RTL5g, RTL5b - raise exception if state invalid
-        if self.__realtime.connection.state in [ConnectionState.CLOSING, ConnectionState.FAILED]:
+        if self.__realtime.connection.state in _UNDETACHABLE_CONNECTION_STATES:
             raise AblyException(
                 message=f"Unable to detach; channel state = {self.state}",
                 code=90001,
@@ -143,7 +169,7 @@ class RealtimeChannel(EventEmitter, Channel):
             )
 
         # RTL5a - if channel already detached do nothing
-        if self.state in [ChannelState.INITIALIZED, ChannelState.DETACHED]:
+        if self.state in _ALREADY_DETACHED_STATES:
             return
 
         if self.state == ChannelState.SUSPENDED:
@@ -173,7 +199,7 @@ class RealtimeChannel(EventEmitter, Channel):
 
         # RTL5d
         detach_msg = {
-            "action": ProtocolMessageAction.DETACH,
+            "action": _DETACH_ACTION,
             "channel": self.__name,
         }
 
@@ -222,14 +248,10 @@ class RealtimeChannel(EventEmitter, Channel):
         else:
             raise ValueError('invalid subscribe arguments')
 
-        log.info(f'RealtimeChannel.subscribe called, channel = {self.name}, event = {event}')
+        log.info('RealtimeChannel.subscribe called, channel = %s, event = %s', self.name, event)
 
-        if event is not None:
-            # RTL7b
-            self.__message_emitter.on(event, listener)
-        else:
-            # RTL7a
-            self.__message_emitter.on(listener)
+        # RTL7a, RTL7b - the listener has been validated above so skip the emitter's argument checks
+        self.__message_emitter._add_listener(event, listener)
 
         # RTL7c
         await self.attach()
@@ -276,17 +298,14 @@ class RealtimeChannel(EventEmitter, Channel):
         else:
             raise ValueError('invalid unsubscribe arguments')
 
-        log.info(f'RealtimeChannel.unsubscribe called, channel = {self.name}, event = {event}')
+        log.info('RealtimeChannel.unsubscribe called, channel = %s, event = %s', self.name, event)
 
         if listener is None:
             # RTL8c
             self.__message_emitter.off()
-        elif event is not None:
-            # RTL8b
-            self.__message_emitter.off(event, listener)
         else:
-            # RTL8a
-            self.__message_emitter.off(listener)
+            # RTL8a, RTL8b - the listener has been validated above so skip the emitter's argument checks
+            self.__message_emitter._remove_listener(event, listener)
 
     def _on_message(self, proto_msg: dict) -> None:
         action = proto_msg.get('action')
@@ -297,50 +316,54 @@ class RealtimeChannel(EventEmitter, Channel):
         # TM2a, TM2c, TM2f
         Message.update_inner_message_fields(proto_msg)
 
-        if action == ProtocolMessageAction.ATTACHED:
-            flags = proto_msg.get('flags')
-            error = proto_msg.get("error")
-            exception = None
-            resumed = False
-
-            if error:
-                exception = AblyException.from_dict(error)
-
-            if flags:
-                resumed = has_flag(flags, Flag.RESUMED)
-
-            #  RTL12
-            if self.state == ChannelState.ATTACHED:
-                if not resumed:
-                    state_change = ChannelStateChange(self.state, ChannelState.ATTACHED, resumed, exception)
-                    self._emit("update", state_change)
-            elif self.state == ChannelState.ATTACHING:
-                self._notify_state(ChannelState.ATTACHED, resumed=resumed)
-            else:
-                log.warn("RealtimeChannel._on_message(): ATTACHED received while not attaching")
-        elif action == ProtocolMessageAction.DETACHED:
-            if self.state == ChannelState.DETACHING:
-                self._notify_state(ChannelState.DETACHED)
-            elif self.state == ChannelState.ATTACHING:
-                self._notify_state(ChannelState.SUSPENDED)
-            else:
-                self._request_state(ChannelState.ATTACHING)
-        elif action == ProtocolMessageAction.MESSAGE:
-            messages = Message.from_encoded_array(proto_msg.get('messages'))
-            for message in messages:
-                self.__message_emitter._emit(message.name, message)
-        elif action == ProtocolMessageAction.ERROR:
-            error = AblyException.from_dict(proto_msg.get('error'))
-            self._notify_state(ChannelState.FAILED, reason=error)
+        handler = self.__action_handlers.get(action)
+        if handler:
+            handler(proto_msg)
+
+    def _handle_attached(self, proto_msg: dict) -> None:
+        error = proto_msg.get("error")
+        exception = None
+        resumed = has_flag(proto_msg.get('flags') or 0, Flag.RESUMED)
+
+        if error:
+            exception = AblyException.from_dict(error)
+
+        #  RTL12
+        if self.state == ChannelState.ATTACHED:
+            if not resumed:
+                state_change = ChannelStateChange(self.state, ChannelState.ATTACHED, resumed, exception)
+                self._emit("update", state_change)
+        elif self.state == ChannelState.ATTACHING:
+            self._notify_state(ChannelState.ATTACHED, resumed=resumed)
+        else:
+            log.warn("RealtimeChannel._on_message(): ATTACHED received while not attaching")
+
+    def _handle_detached(self, proto_msg: dict) -> None:
+        if self.state == ChannelState.DETACHING:
+            self._notify_state(ChannelState.DETACHED)
+        elif self.state == ChannelState.ATTACHING:
+            self._notify_state(ChannelState.SUSPENDED)
+        else:
+            self._request_state(ChannelState.ATTACHING)
+
+    def _handle_message(self, proto_msg: dict) -> None:
+        messages = Message.from_encoded_array(proto_msg.get('messages'))
+        # Only consecutive messages are grouped so listeners still receive messages in the order they arrived
+        for name, group in groupby(messages, key=attrgetter('name')):
+            self.__message_emitter._emit_many(name, group)
+
+    def _handle_error(self, proto_msg: dict) -> None:
+        error = AblyException.from_dict(proto_msg.get('error'))
+        self._notify_state(ChannelState.FAILED, reason=error)
 
     def _request_state(self, state: ChannelState) -> None:
-        log.debug(f'RealtimeChannel._request_state(): state = {state}')
+        log.debug('RealtimeChannel._request_state(): state = %s', state)
         self._notify_state(state)
         self._check_pending_state()
 
     def _notify_state(self, state: ChannelState, reason: Optional[AblyException] = None,
                       resumed: bool = False) -> None:
-        log.debug(f'RealtimeChannel._notify_state(): state = {state}')
+        log.debug('RealtimeChannel._notify_state(): state = %s', state)
 
         self.__clear_state_timer()
 
@@ -361,11 +384,11 @@ class RealtimeChannel(EventEmitter, Channel):
         # RTL4j1
         if state == ChannelState.ATTACHED:
             self.__attach_resume = True
-        if state in (ChannelState.DETACHING, ChannelState.FAILED):
+        if state in _CLEAR_ATTACH_RESUME_STATES:
             self.__attach_resume = False
 
         # RTP5a1
-        if state in (ChannelState.DETACHED, ChannelState.SUSPENDED, ChannelState.FAILED):
+        if state in _CLEAR_CHANNEL_SERIAL_STATES:
             self.__channel_serial = None
 
         state_change = ChannelStateChange(self.__state, state, resumed, reason=reason)
@@ -375,13 +398,13 @@ class RealtimeChannel(EventEmitter, Channel):
         self.__internal_state_emitter._emit(state, state_change)
 
     def _send_message(self, msg: dict) -> None:
-        asyncio.create_task(self.__realtime.connection.connection_manager.send_protocol_message(msg))
+        self.__connection_manager.send_protocol_message_nowait(msg)
 
     def _check_pending_state(self):
-        connection_state = self.__realtime.connection.connection_manager.state
+        connection_state = self.__connection_manager.state
 
         if connection_state is not ConnectionState.CONNECTED:
-            log.debug(f"RealtimeChannel._check_pending_state(): connection state = {connection_state}")
+            log.debug("RealtimeChannel._check_pending_state(): connection state = %s", connection_state)
             return
 
         if self.state == ChannelState.ATTACHING:
@@ -398,7 +421,8 @@ class RealtimeChannel(EventEmitter, Channel):
                 self.__state_timer = None
                 self.__timeout_pending_state()
 
-            self.__state_timer = Timer(self.__realtime.options.realtime_request_timeout, on_timeout)
+            self.__state_timer = self.__realtime.options.loop.call_later(
+                self.__realtime.options.realtime_request_timeout / 1000, on_timeout)
 
     def __clear_state_timer(self) -> None:
         if self.__state_timer:
@@ -418,7 +442,8 @@ class RealtimeChannel(EventEmitter, Channel):
         if self.__retry_timer:
             return
 
-        self.__retry_timer = Timer(self.ably.options.channel_retry_timeout, self.__on_retry_timer_expire)
+        self.__retry_timer = self.ably.options.loop.call_later(
+            self.ably.options.channel_retry_timeout / 1000, self.__on_retry_timer_expire)
 
     def __cancel_retry_timer(self) -> None:
         if self.__retry_timer:
@@ -501,18 +526,13 @@ class Channels(RestChannels):
     def _on_channel_message(self, msg: dict) -> None:
         channel_name = msg.get('channel')
         if not channel_name:
-            log.error(
-                'Channels.on_channel_message()',
-                f'received event without channel, action = {msg.get("action")}'
-            )
+            log.error('Channels.on_channel_message(): received event without channel, action = %s',
+                      msg.get('action'))
             return
 
         channel = self.__all[channel_name]
         if not channel:
-            log.warning(
-                'Channels.on_channel_message()',
-                f'receieved event for non-existent channel: {channel_name}'
-            )
+            log.warning('Channels.on_channel_message(): received event for non-existent channel: %s', channel_name)
             return
 
         channel._on_message(msg)
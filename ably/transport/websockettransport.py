@@ -2,7 +2,6 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 import asyncio
 from enum import IntEnum
-import json
 import logging
 import socket
 import urllib.parse
@@ -12,7 +11,29 @@ from ably.util.eventemitter import EventEmitter
 from ably.util.exceptions import AblyException
 from ably.util.helper import Timer, unix_time_ms
 from websockets.client import WebSocketClientProtocol, connect as ws_connect
-from websockets.exceptions import ConnectionClosedOK, WebSocketException
+from websockets.exceptions import ConnectionClosed, ConnectionClosedOK, WebSocketException
+
+try:
+    # orjson is an optional, faster drop-in for (de)serialising protocol messages;
+    # it accepts both the str (text frame) and bytes (binary frame) payloads websockets yields
+    import json
+    import orjson
+
+    def json_loads(raw):
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects lone surrogates such as "\ud83d", which are valid JSON that other SDKs can publish
+            return json.loads(raw)
+
+    def json_dumps(obj) -> str:
+        # Ably expects JSON protocol messages in text frames, orjson returns utf-8 bytes
+        try:
+            return orjson.dumps(obj).decode()
+        except orjson.JSONEncodeError:
+            return json.dumps(obj)
+except ImportError:
+    from json import dumps as json_dumps, loads as json_loads
 
 if TYPE_CHECKING:
     from ably.realtime.connection import ConnectionManager
@@ -35,10 +56,21 @@ class ProtocolMessageAction(IntEnum):
     AUTH = 17
 
 
+_CHANNEL_ACTIONS = frozenset((
+    ProtocolMessageAction.ATTACHED,
+    ProtocolMessageAction.DETACHED,
+    ProtocolMessageAction.MESSAGE,
+))
+
+# Actions whose handlers never await, so the read loop can handle them without scheduling a task
+_INLINE_ACTIONS = _CHANNEL_ACTIONS | {ProtocolMessageAction.HEARTBEAT}
+
+
 class WebSocketTransport(EventEmitter):
     def __init__(self, connection_manager: ConnectionManager, host: str, params: dict):
         self.websocket: WebSocketClientProtocol | None = None
-        self.read_loop: asyncio.Task | None = None
+        self.write_loop: asyncio.Task | None = None
+        self.outgoing_messages: asyncio.Queue = asyncio.Queue()
         self.connect_task: asyncio.Task | None = None
         self.ws_connect_task: asyncio.Task | None = None
         self.connection_manager = connection_manager
@@ -73,28 +105,49 @@ class WebSocketTransport(EventEmitter):
 
     async def ws_connect(self, ws_url, headers):
         try:
-            async with ws_connect(ws_url, extra_headers=headers) as websocket:
+            # Raise the incoming buffer high-water mark (64 KiB by default) so bursts of frames
+            # are read in fewer socket reads before websockets pauses reading. Protocol messages
+            # are mostly small JSON frames, for which permessage-deflate costs more CPU than it saves
+            async with ws_connect(
+                ws_url, extra_headers=headers, read_limit=2 ** 20, compression=None
+            ) as websocket:
                 log.info(f'ws_connect(): connection established to {ws_url}')
                 self._emit('connected')
                 self.websocket = websocket
-                self.read_loop = self.connection_manager.options.loop.create_task(self.ws_read_loop())
-                self.read_loop.add_done_callback(self.on_read_loop_done)
+                self.write_loop = self.connection_manager.options.loop.create_task(self.ws_write_loop())
+                # The read loop runs inline in ws_connect_task, so cancelling that task in dispose() stops it
                 try:
-                    await self.read_loop
+                    await self.ws_read_loop()
                 except WebSocketException as err:
                     if not self.is_disposed:
                         await self.dispose()
                         self.connection_manager.deactivate_transport(err)
+                finally:
+                    self.stop_write_loop()
         except (WebSocketException, socket.gaierror) as e:
             exception = AblyException(f'Error opening websocket connection: {e}', 400, 40000)
             log.exception(f'WebSocketTransport.ws_connect(): Error opening websocket connection: {exception}')
             self._emit('failed', exception)
             raise exception
 
-    async def on_protocol_message(self, msg):
+    def on_inline_protocol_message(self, msg):
         self.on_activity()
-        log.debug(f'WebSocketTransport.on_protocol_message(): received protocol message: {msg}')
+        log.debug('WebSocketTransport.on_inline_protocol_message(): received protocol message: %s', msg)
         action = msg.get('action')
+        # Channel messages are by far the most frequent so they are checked first
+        if action in _CHANNEL_ACTIONS:
+            self.connection_manager.on_channel_message(msg)
+        elif action == ProtocolMessageAction.HEARTBEAT:
+            id = msg.get('id')
+            self.connection_manager.on_heartbeat(id)
+
+    async def on_protocol_message(self, msg):
+        action = msg.get('action')
+        if action in _INLINE_ACTIONS:
+            self.on_inline_protocol_message(msg)
+            return
+        self.on_activity()
+        log.debug('WebSocketTransport.on_protocol_message(): received protocol message: %s', msg)
         if action == ProtocolMessageAction.CONNECTED:
             connection_id = msg.get('connectionId')
             connection_details = ConnectionDetails.from_dict(msg.get('connectionDetails'))
@@ -132,28 +185,52 @@ class WebSocketTransport(EventEmitter):
             error = msg.get('error')
             exception = AblyException.from_dict(error)
             await self.connection_manager.on_error(msg, exception)
-        elif action == ProtocolMessageAction.HEARTBEAT:
-            id = msg.get('id')
-            self.connection_manager.on_heartbeat(id)
-        elif action in (
-            ProtocolMessageAction.ATTACHED,
-            ProtocolMessageAction.DETACHED,
-            ProtocolMessageAction.MESSAGE
-        ):
-            self.connection_manager.on_channel_message(msg)
 
     async def ws_read_loop(self):
         if not self.websocket:
             raise AblyException('ws_read_loop started with no websocket', 500, 50000)
         try:
-            async for raw in self.websocket:
-                msg = json.loads(raw)
-                task = asyncio.create_task(self.on_protocol_message(msg))
-                task.add_done_callback(self.on_protcol_message_handled)
+            while True:
+                msgs = [json_loads(await self.websocket.recv())]
+                # Drain any frames websockets has already buffered so a burst of frames is
+                # handled in one pass of the loop
+                while self.websocket.messages:
+                    msgs.append(json_loads(await self.websocket.recv()))
+                self.on_protocol_messages(msgs)
         except ConnectionClosedOK:
             return
 
+    def on_protocol_messages(self, msgs):
+        spawned = False
+        for msg in msgs:
+            # Messages whose handlers await (e.g. AUTH) get a task each so they never hold up later
+            # frames. Once a task has been spawned the rest of the batch is spawned too, so handlers
+            # still start in the order the messages arrived
+            if spawned or msg.get('action') not in _INLINE_ACTIONS:
+                spawned = True
+                task = asyncio.create_task(self.on_protocol_message(msg))
+                task.add_done_callback(self.on_protcol_message_handled)
+                continue
+            try:
+                self.on_inline_protocol_message(msg)
+            except Exception as e:
+                log.exception(f"WebSocketTransport.on_protocol_messages(): uncaught exception: {e}")
+
+    async def ws_write_loop(self):
+        while True:
+            message = await self.outgoing_messages.get()
+            try:
+                await self.send(message)
+            except ConnectionClosed:
+                self.connection_manager.queued_messages.put(message)
+                self.requeue_outgoing_messages()
+                return
+            except Exception as e:
+                log.exception(f"WebSocketTransport.ws_write_loop(): failed to send protocol message: {e}")
+
     def on_protcol_message_handled(self, task):
+        if task.cancelled():
+            return
         try:
             exception = task.exception()
         except Exception as e:
@@ -161,18 +238,9 @@ class WebSocketTransport(EventEmitter):
         if exception is not None:
             log.exception(f"WebSocketTransport.on_protocol_message_handled(): uncaught exception: {exception}")
 
-    def on_read_loop_done(self, task: asyncio.Task):
-        try:
-            exception = task.exception()
-        except asyncio.CancelledError as e:
-            exception = e
-        if isinstance(exception, ConnectionClosedOK):
-            return
-
     async def dispose(self):
         self.is_disposed = True
-        if self.read_loop:
-            self.read_loop.cancel()
+        self.stop_write_loop()
         if self.ws_connect_task:
             self.ws_connect_task.cancel()
         if self.idle_timer:
@@ -189,10 +257,31 @@ class WebSocketTransport(EventEmitter):
     async def send(self, message: dict):
         if self.websocket is None:
             raise Exception()
-        raw_msg = json.dumps(message)
-        log.info(f'WebSocketTransport.send(): sending {raw_msg}')
+        raw_msg = json_dumps(message)
+        log.info('WebSocketTransport.send(): sending %s', raw_msg)
         await self.websocket.send(raw_msg)
 
+    def send_nowait(self, message: dict):
+        if self.write_loop is None or self.write_loop.done():
+            # Nothing would ever take the message off the writer queue, so the connection manager
+            # keeps it until the next transport is connected or the connection fails
+            log.info('WebSocketTransport.send_nowait(): write loop not running, requeueing %s', message)
+            self.connection_manager.queued_messages.put(message)
+            return
+        self.outgoing_messages.put_nowait(message)
+
+    def stop_write_loop(self):
+        if self.write_loop:
+            self.write_loop.cancel()
+            self.write_loop = None
+        self.requeue_outgoing_messages()
+
+    def requeue_outgoing_messages(self):
+        # Hand messages that were never written back to the connection manager, which resends them
+        # once connected again or fails them along with the rest of its queue
+        while not self.outgoing_messages.empty():
+            self.connection_manager.queued_messages.put(self.outgoing_messages.get_nowait())
+
     def set_idle_timer(self, timeout: float):
         if not self.idle_timer:
             self.idle_timer = Timer(timeout, self.on_idle_timer_expire)
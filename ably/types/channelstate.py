@@ -1,3 +1,4 @@
+import sys
 from dataclasses import dataclass
 from typing import Optional
 from enum import Enum
@@ -14,7 +15,9 @@ class ChannelState(str, Enum):
     FAILED = 'failed'
 
 
-@dataclass
+# dataclass slots are only supported from python 3.10; without a __dict__ each state change is
+# less than half the size, which matters as one is allocated on every channel state transition
+@dataclass(**({'slots': True} if sys.version_info >= (3, 10) else {}))
 class ChannelStateChange:
     previous: ChannelState
     current: ChannelState
@@ -1,14 +1,11 @@
 import asyncio
 import logging
-from pyee.asyncio import AsyncIOEventEmitter
+from typing import Callable, NamedTuple
 
 from ably.util.helper import is_callable_or_coroutine
 
-# pyee's event emitter doesn't support attaching a listener to all events
-# so to patch it, we create a wrapper which uses two event emitters, one
-# is used to listen to all events and this arbitrary string is the event name
-# used to emit all events on that listener
-_all_event = 'all'
+# Listeners registered for all events are stored under this key, which cannot clash with an event name
+_all_event = object()
 
 log = logging.getLogger(__name__)
 
@@ -21,6 +18,19 @@ def _is_all_event_args(*args):
     return len(args) == 1 and is_callable_or_coroutine(args[0])
 
 
+class _Listener(NamedTuple):
+    listener: Callable
+    is_coroutine: bool
+    once: bool
+
+
+async def _call_async_listener(listener, args):
+    try:
+        await listener(*args)
+    except Exception as err:
+        log.exception(f'EventEmitter.emit(): uncaught listener exception: {err}')
+
+
 class EventEmitter:
     """
     A generic interface for event registration and delivery used in a number of the types in the Realtime client
@@ -37,9 +47,11 @@ class EventEmitter:
     """
 
     def __init__(self):
-        self.__named_event_emitter = AsyncIOEventEmitter()
-        self.__all_event_emitter = AsyncIOEventEmitter()
-        self.__wrapped_listeners = {}
+        # Listeners are stored as an immutable tuple per event which is replaced on on/once/off, so emitting
+        # iterates it directly without copying even if listeners are added or removed while it is running
+        self.__listeners = {}
+        # Bumped whenever the registry changes, so _emit_many knows when its listener tuples are stale
+        self.__version = 0
 
     def on(self, *args):
         """
@@ -58,32 +70,13 @@ class EventEmitter:
         if _is_all_event_args(*args):
             event = _all_event
             listener = args[0]
-            emitter = self.__all_event_emitter
-            # self.__all_event_emitter.add_listener(_all_event, args[0])
         elif _is_named_event_args(*args):
             event = args[0]
             listener = args[1]
-            emitter = self.__named_event_emitter
-            # self.__named_event_emitter.add_listener(args[0], args[1])
         else:
             raise ValueError("EventEmitter.on(): invalid args")
 
-        if asyncio.iscoroutinefunction(listener):
-            async def wrapped_listener(*args, **kwargs):
-                try:
-                    await listener(*args, **kwargs)
-                except Exception as err:
-                    log.exception(f'EventEmitter.emit(): uncaught listener exception: {err}')
-        else:
-            def wrapped_listener(*args, **kwargs):
-                try:
-                    listener(*args, **kwargs)
-                except Exception as err:
-                    log.exception(f'EventEmitter.emit(): uncaught listener exception: {err}')
-
-        self.__wrapped_listeners[listener] = wrapped_listener
-
-        emitter.add_listener(event, wrapped_listener)
+        self.__add_entry(event, listener, once=False)
 
     def once(self, *args):
         """
@@ -103,32 +96,13 @@ class EventEmitter:
         if _is_all_event_args(*args):
             event = _all_event
             listener = args[0]
-            emitter = self.__all_event_emitter
-            # self.__all_event_emitter.add_listener(_all_event, args[0])
         elif _is_named_event_args(*args):
             event = args[0]
             listener = args[1]
-            emitter = self.__named_event_emitter
-            # self.__named_event_emitter.add_listener(args[0], args[1])
         else:
             raise ValueError("EventEmitter.on(): invalid args")
 
-        if asyncio.iscoroutinefunction(listener):
-            async def wrapped_listener(*args, **kwargs):
-                try:
-                    await listener(*args, **kwargs)
-                except Exception as err:
-                    log.exception(f'EventEmitter.emit(): uncaught listener exception: {err}')
-        else:
-            def wrapped_listener(*args, **kwargs):
-                try:
-                    listener(*args, **kwargs)
-                except Exception as err:
-                    log.exception(f'EventEmitter.emit(): uncaught listener exception: {err}')
-
-        self.__wrapped_listeners[listener] = wrapped_listener
-
-        emitter.once(event, wrapped_listener)
+        self.__add_entry(event, listener, once=True)
 
     def off(self, *args):
         """
@@ -143,27 +117,71 @@ class EventEmitter:
             The event listener.
         """
         if len(args) == 0:
-            self.__all_event_emitter.remove_all_listeners()
-            self.__named_event_emitter.remove_all_listeners()
+            self.__listeners.clear()
+            self.__version += 1
             return
         elif _is_all_event_args(*args):
             event = _all_event
             listener = args[0]
-            emitter = self.__all_event_emitter
         elif _is_named_event_args(*args):
             event = args[0]
             listener = args[1]
-            emitter = self.__named_event_emitter
         else:
             raise ValueError("EventEmitter.once(): invalid args")
 
-        wrapped_listener = self.__wrapped_listeners.get(listener)
+        self.__remove_entries(event, listener)
+
+    def _add_listener(self, event, listener):
+        # Registers a listener whose arguments the caller has already validated, skipping the checks in on().
+        # An event of None registers the listener for all events
+        self.__add_entry(_all_event if event is None else event, listener, once=False)
+
+    def _remove_listener(self, event, listener):
+        # Deregisters a listener whose arguments the caller has already validated, skipping the checks in off().
+        # An event of None deregisters the listener from all events
+        self.__remove_entries(_all_event if event is None else event, listener)
+
+    def __add_entry(self, event, listener, once):
+        entry = _Listener(listener, asyncio.iscoroutinefunction(listener), once)
+        self.__set_listeners(event, self.__listeners.get(event, ()) + (entry,))
 
-        if wrapped_listener is None:
+    def __remove_entries(self, event, listener):
+        entries = self.__listeners.get(event)
+
+        if not entries:
             return
 
-        emitter.remove_listener(event, wrapped_listener)
-        self.__wrapped_listeners[listener] = None
+        self.__set_listeners(event, tuple(entry for entry in entries if entry.listener != listener))
+
+    def __remove_entry(self, event, entry):
+        entries = self.__listeners.get(event, ())
+        if not any(e is entry for e in entries):
+            return False
+        self.__set_listeners(event, tuple(e for e in entries if e is not entry))
+        return True
+
+    def __set_listeners(self, event, entries):
+        self.__version += 1
+        if entries:
+            self.__listeners[event] = entries
+        else:
+            self.__listeners.pop(event, None)
+
+    def __call_listeners(self, event, args):
+        self.__call_entries(event, self.__listeners.get(event, ()), args)
+
+    def __call_entries(self, event, entries, args):
+        for entry in entries:
+            # A once listener may already have been removed by an earlier listener in this emit
+            if entry.once and not self.__remove_entry(event, entry):
+                continue
+            if entry.is_coroutine:
+                asyncio.ensure_future(_call_async_listener(entry.listener, args))
+                continue
+            try:
+                entry.listener(*args)
+            except Exception as err:
+                log.exception(f'EventEmitter.emit(): uncaught listener exception: {err}')
 
     async def once_async(self, state=None):
         future = asyncio.Future()
@@ -181,5 +199,21 @@ class EventEmitter:
         return state_change
 
     def _emit(self, *args):
-        self.__named_event_emitter.emit(*args)
-        self.__all_event_emitter.emit(_all_event, *args[1:])
+        self.__call_listeners(args[0], args[1:])
+        self.__call_listeners(_all_event, args[1:])
+
+    def _emit_many(self, event, items):
+        # Emits each item as its own event, in order. The listener tuples are looked up once for the whole
+        # batch and only looked up again after a listener has changed the registry (including a once
+        # listener removing itself), so every item sees the same listeners a separate _emit() would
+        version = None
+        for item in items:
+            args = (item,)
+            if version != self.__version:
+                version = self.__version
+                named = self.__listeners.get(event, ())
+                everyone = self.__listeners.get(_all_event, ())
+            self.__call_entries(event, named, args)
+            if version != self.__version:
+                everyone = self.__listeners.get(_all_event, ())
+            self.__call_entries(_all_event, everyone, args)
@@ -7,6 +7,7 @@ from test.ably.testapp import TestApp
 @pytest.fixture(scope='session', autouse=True)
 def event_loop():
     loop = asyncio.get_event_loop_policy().new_event_loop()
-    loop.run_until_complete(TestApp.get_test_vars())
+    # The sandbox app is created by the first test that asks for TestApp.get_test_vars(), so tests that
+    # never talk to Ably run without a network connection
     yield loop
     loop.run_until_complete(TestApp.clear_test_vars())
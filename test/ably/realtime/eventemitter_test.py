@@ -1,15 +1,22 @@
 import asyncio
+from ably import AblyRealtime
 from ably.realtime.connection import ConnectionState
-from test.ably.testapp import TestApp
 from test.ably.utils import BaseAsyncTestCase
 
 
 class TestEventEmitter(BaseAsyncTestCase):
     async def asyncSetUp(self):
-        self.test_vars = await TestApp.get_test_vars()
+        # The client never connects; connection state changes are driven in-process through the
+        # connection manager so the connection's event emitter is exercised without a websocket
+        self.realtime = AblyRealtime('api:key', auto_connect=False)
+
+    async def asyncTearDown(self):
+        await self.realtime.close()
+
+    def notify_state(self, state):
+        self.realtime.connection.connection_manager.enact_state_change(state)
 
     async def test_event_listener_error(self):
-        realtime = await TestApp.get_ably_realtime()
         call_count = 0
 
         def listener(_):
@@ -19,28 +26,26 @@ class TestEventEmitter(BaseAsyncTestCase):
 
         # If a listener throws an exception it should not propagate (#RTE6)
         listener.side_effect = Exception()
-        realtime.connection.on(ConnectionState.CONNECTED, listener)
+        self.realtime.connection.on(ConnectionState.CONNECTED, listener)
 
-        realtime.connect()
-        await realtime.connection.once_async(ConnectionState.CONNECTED)
+        self.notify_state(ConnectionState.CONNECTED)
+        await self.realtime.connection.once_async(ConnectionState.CONNECTED)
 
         assert call_count == 1
-        await realtime.close()
 
     async def test_event_emitter_off(self):
-        realtime = await TestApp.get_ably_realtime()
         call_count = 0
 
         def listener(_):
             nonlocal call_count
             call_count += 1
 
-        realtime.connection.on(ConnectionState.CONNECTED, listener)
-        realtime.connection.off(ConnectionState.CONNECTED, listener)
+        self.realtime.connection.on(ConnectionState.CONNECTED, listener)
+        self.realtime.connection.off(ConnectionState.CONNECTED, listener)
 
-        await realtime.connection.once_async(ConnectionState.CONNECTED)
+        self.notify_state(ConnectionState.CONNECTED)
+        await self.realtime.connection.once_async(ConnectionState.CONNECTED)
 
         assert call_count == 0
         await asyncio.sleep(0)
         assert call_count == 0
-        await realtime.close()
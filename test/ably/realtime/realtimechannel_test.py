@@ -251,13 +251,13 @@ class TestRealtimeChannel(BaseAsyncTestCase):
     async def test_realtime_request_timeout_attach(self):
         ably = await TestApp.get_ably_realtime(realtime_request_timeout=2000)
         await ably.connection.once_async(ConnectionState.CONNECTED)
-        original_send_protocol_message = ably.connection.connection_manager.send_protocol_message
+        original_send_protocol_message = ably.connection.connection_manager.send_protocol_message_nowait
 
-        async def new_send_protocol_message(msg):
+        def new_send_protocol_message(msg):
             if msg.get('action') == ProtocolMessageAction.ATTACH:
                 return
-            await original_send_protocol_message(msg)
-        ably.connection.connection_manager.send_protocol_message = new_send_protocol_message
+            original_send_protocol_message(msg)
+        ably.connection.connection_manager.send_protocol_message_nowait = new_send_protocol_message
 
         channel = ably.channels.get('channel_name')
         with pytest.raises(AblyException) as exception:
@@ -269,13 +269,13 @@ class TestRealtimeChannel(BaseAsyncTestCase):
     async def test_realtime_request_timeout_detach(self):
         ably = await TestApp.get_ably_realtime(realtime_request_timeout=2000)
         await ably.connection.once_async(ConnectionState.CONNECTED)
-        original_send_protocol_message = ably.connection.connection_manager.send_protocol_message
+        original_send_protocol_message = ably.connection.connection_manager.send_protocol_message_nowait
 
-        async def new_send_protocol_message(msg):
+        def new_send_protocol_message(msg):
             if msg.get('action') == ProtocolMessageAction.DETACH:
                 return
-            await original_send_protocol_message(msg)
-        ably.connection.connection_manager.send_protocol_message = new_send_protocol_message
+            original_send_protocol_message(msg)
+        ably.connection.connection_manager.send_protocol_message_nowait = new_send_protocol_message
 
         channel = ably.channels.get('channel_name')
         await channel.attach()
@@ -353,16 +353,16 @@ class TestRealtimeChannel(BaseAsyncTestCase):
         channel = ably.channels.get(channel_name)
         call_count = 0
 
-        original_send_protocol_message = ably.connection.connection_manager.send_protocol_message
+        original_send_protocol_message = ably.connection.connection_manager.send_protocol_message_nowait
 
         # Discard the first ATTACHED message recieved
-        async def new_send_protocol_message(msg):
+        def new_send_protocol_message(msg):
             nonlocal call_count
             if call_count == 0 and msg.get('action') == ProtocolMessageAction.ATTACH:
                 call_count += 1
                 return
-            await original_send_protocol_message(msg)
-        ably.connection.connection_manager.send_protocol_message = new_send_protocol_message
+            original_send_protocol_message(msg)
+        ably.connection.connection_manager.send_protocol_message_nowait = new_send_protocol_message
 
         with pytest.raises(AblyException):
             await channel.attach()
@@ -28,19 +28,21 @@ if rest_host and not rest_host.endswith("rest.ably.io"):
     tls_port = 8081
 
 
-ably = AblyRest(token='not_a_real_token',
-                port=port, tls_port=tls_port, tls=tls,
-                environment=environment,
-                use_binary_protocol=False)
-
-
 class TestApp:
     __test_vars = None
 
     @staticmethod
     async def get_test_vars():
         if not TestApp.__test_vars:
-            r = await ably.http.post("/apps", body=app_spec_local, skip_auth=True)
+            # The app may be created from any test's event loop, so the client must not outlive this call
+            ably = AblyRest(token='not_a_real_token',
+                            port=port, tls_port=tls_port, tls=tls,
+                            environment=environment,
+                            use_binary_protocol=False)
+            try:
+                r = await ably.http.post("/apps", body=app_spec_local, skip_auth=True)
+            finally:
+                await ably.close()
             AblyException.raise_for_response(r)
 
             app_spec = r.json()
@@ -104,6 +106,8 @@ class TestApp:
     @staticmethod
     async def clear_test_vars():
         test_vars = TestApp.__test_vars
+        if not test_vars:
+            return
         options = Options(key=test_vars["keys"][0]["key_str"])
         options.rest_host = test_vars["host"]
         options.port = test_vars["port"]
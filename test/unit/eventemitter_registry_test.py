@@ -0,0 +1,105 @@
+import asyncio
+from ably.util.eventemitter import EventEmitter
+from test.ably.utils import BaseAsyncTestCase
+
+
+class TestEventEmitter(BaseAsyncTestCase):
+    async def asyncSetUp(self):
+        self.emitter = EventEmitter()
+
+    async def test_once_listener_called_once(self):
+        call_count = 0
+
+        async def listener(_):
+            nonlocal call_count
+            call_count += 1
+
+        self.emitter.once(listener)
+
+        self.emitter._emit('event', 1)
+        self.emitter._emit('event', 2)
+        await asyncio.sleep(0)
+
+        assert call_count == 1
+
+    async def test_off_removes_every_registration(self):
+        calls = []
+
+        def listener(arg):
+            calls.append(arg)
+
+        self.emitter.on('event', listener)
+        self.emitter.on('event', listener)
+        self.emitter._emit('event', 1)
+        self.emitter.off('event', listener)
+        self.emitter._emit('event', 2)
+
+        assert calls == [1, 1]
+
+    async def test_once_listener_removed_during_emit(self):
+        calls = []
+
+        def second(arg):
+            calls.append(arg)
+
+        def first(_):
+            self.emitter.off('event', second)
+
+        self.emitter.on('event', first)
+        self.emitter.once('event', second)
+        self.emitter._emit('event', 1)
+        self.emitter._emit('event', 2)
+
+        assert calls == []
+
+    async def test_coroutine_listener_exception_is_logged(self):
+        async def listener(_):
+            raise Exception('listener error')
+
+        self.emitter.on('event', listener)
+
+        # RTE6
+        with self.assertLogs('ably.util.eventemitter', level='ERROR') as logs:
+            self.emitter._emit('event', 1)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+
+        assert 'listener error' in logs.output[0]
+
+    async def test_event_named_all(self):
+        named_calls = []
+        all_calls = []
+
+        def named_listener(arg):
+            named_calls.append(arg)
+
+        def all_listener(arg):
+            all_calls.append(arg)
+
+        self.emitter.on('all', named_listener)
+        self.emitter.on(all_listener)
+
+        self.emitter._emit('other', 1)
+        self.emitter._emit('all', 2)
+
+        assert named_calls == [2]
+        assert all_calls == [1, 2]
+
+    async def test_emit_many_sees_registry_changes(self):
+        once_calls = []
+        all_calls = []
+
+        def once_listener(arg):
+            once_calls.append(arg)
+
+        def all_listener(arg):
+            all_calls.append(arg)
+            if arg == 2:
+                self.emitter.off(all_listener)
+
+        self.emitter.once('event', once_listener)
+        self.emitter.on(all_listener)
+        self.emitter._emit_many('event', [1, 2, 3])
+
+        assert once_calls == [1]
+        assert all_calls == [1, 2]
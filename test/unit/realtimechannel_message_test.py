@@ -0,0 +1,45 @@
+import mock
+
+from ably import AblyRealtime
+from ably.transport.websockettransport import ProtocolMessageAction
+from test.ably.utils import BaseAsyncTestCase
+
+
+class TestRealtimeChannel(BaseAsyncTestCase):
+    async def asyncSetUp(self):
+        self.realtime = AblyRealtime('api:key', auto_connect=False)
+        self.channel = self.realtime.channels.get('channel')
+
+    async def asyncTearDown(self):
+        await self.realtime.close()
+
+    async def test_mixed_name_batch_keeps_arrival_order(self):
+        received = []
+        named = []
+
+        def listener(message):
+            received.append(message.data)
+
+        def named_listener(message):
+            named.append(message.data)
+
+        # The channel never attaches, messages are fed to it as if they arrived from the transport
+        with mock.patch.object(self.channel, 'attach', mock.AsyncMock()):
+            await self.channel.subscribe(listener)
+            await self.channel.subscribe('a', named_listener)
+
+        self.channel._on_message({
+            'action': ProtocolMessageAction.MESSAGE,
+            'id': 'connection:0',
+            'messages': [
+                {'name': 'a', 'data': 1},
+                {'name': 'a', 'data': 2},
+                {'name': 'b', 'data': 3},
+                {'name': 'a', 'data': 4},
+                {'name': 'c', 'data': 5},
+                {'name': 'b', 'data': 6},
+            ],
+        })
+
+        assert received == [1, 2, 3, 4, 5, 6]
+        assert named == [1, 2, 4]
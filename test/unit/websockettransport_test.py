@@ -0,0 +1,139 @@
+import asyncio
+from collections import deque
+from queue import Queue
+
+import mock
+from websockets.exceptions import ConnectionClosedOK
+
+from ably import AblyRealtime
+from ably.realtime.connection import ConnectionState
+from ably.transport.websockettransport import ProtocolMessageAction, WebSocketTransport, json_dumps, json_loads
+from test.ably.utils import BaseAsyncTestCase
+
+
+class StubWebSocket:
+    def __init__(self, frames=()):
+        self.messages = deque(json_dumps(frame) for frame in frames)
+        self.sent = []
+        self.send_blocked = False
+
+    async def recv(self):
+        if not self.messages:
+            raise ConnectionClosedOK(None, None)
+        return self.messages.popleft()
+
+    async def send(self, raw_msg):
+        if self.send_blocked:
+            await asyncio.get_running_loop().create_future()
+        self.sent.append(raw_msg)
+
+    async def close(self):
+        pass
+
+
+class TestWebSocketTransport(BaseAsyncTestCase):
+    async def asyncSetUp(self):
+        self.connection_manager = mock.Mock()
+        self.connection_manager.queued_messages = Queue()
+        self.transport = WebSocketTransport(self.connection_manager, 'example.com', {})
+
+    async def test_protocol_message_round_trip(self):
+        actions = (ProtocolMessageAction.CLOSE, ProtocolMessageAction.HEARTBEAT, ProtocolMessageAction.MESSAGE)
+        for action in actions:
+            raw_msg = json_dumps({'action': action, 'id': 'connection:0', 'messages': [{'data': 'ü'}]})
+
+            # Protocol messages must go out as text frames whichever JSON library is installed
+            assert isinstance(raw_msg, str)
+            msg = json_loads(raw_msg)
+            assert msg == {'action': int(action), 'id': 'connection:0', 'messages': [{'data': 'ü'}]}
+            assert msg['action'] == action
+            # Binary frames decode the same way
+            assert json_loads(raw_msg.encode()) == msg
+
+        # A lone surrogate is valid JSON even though it is not valid unicode, other SDKs can publish one
+        raw_msg = '{"action": 15, "messages": [{"data": "\\ud83d"}]}'
+        assert json_loads(raw_msg) == {'action': ProtocolMessageAction.MESSAGE, 'messages': [{'data': '\ud83d'}]}
+        assert json_loads(json_dumps(json_loads(raw_msg))) == json_loads(raw_msg)
+
+    async def test_read_loop_keeps_order_without_blocking(self):
+        channel_messages = []
+        self.connection_manager.on_channel_message.side_effect = \
+            lambda msg: channel_messages.append(msg['id'])
+        auth_pending = asyncio.get_running_loop().create_future()
+
+        async def authorize():
+            await auth_pending
+
+        self.connection_manager.ably.auth.authorize = authorize
+        self.transport.websocket = StubWebSocket([
+            {'action': ProtocolMessageAction.MESSAGE, 'id': 'a'},
+            {'action': ProtocolMessageAction.HEARTBEAT, 'id': 'h'},
+            {'action': ProtocolMessageAction.ATTACHED, 'id': 'b'},
+            {'action': ProtocolMessageAction.AUTH},
+            {'action': ProtocolMessageAction.MESSAGE, 'id': 'c'},
+        ])
+
+        await self.transport.ws_read_loop()
+
+        # Channel messages and heartbeats ahead of the AUTH are handled inline by the read loop
+        assert channel_messages == ['a', 'b']
+        self.connection_manager.on_heartbeat.assert_called_once_with('h')
+
+        await asyncio.sleep(0)
+
+        # The message after the AUTH is handled even though reauth never completes
+        assert channel_messages == ['a', 'b', 'c']
+        assert not auth_pending.done()
+        auth_pending.cancel()
+
+    def start_write_loop(self):
+        self.transport.websocket = StubWebSocket()
+        self.transport.write_loop = asyncio.create_task(self.transport.ws_write_loop())
+        return self.transport.websocket
+
+    def queued_messages(self):
+        queued = []
+        while not self.connection_manager.queued_messages.empty():
+            queued.append(self.connection_manager.queued_messages.get())
+        return queued
+
+    async def test_write_loop_sends_in_order(self):
+        websocket = self.start_write_loop()
+
+        for serial in range(3):
+            self.transport.send_nowait({'action': ProtocolMessageAction.MESSAGE, 'msgSerial': serial})
+        await asyncio.sleep(0.01)
+
+        assert websocket.sent == [
+            json_dumps({'action': ProtocolMessageAction.MESSAGE, 'msgSerial': serial}) for serial in range(3)
+        ]
+        await self.transport.dispose()
+
+    async def test_dispose_requeues_unsent_messages(self):
+        websocket = self.start_write_loop()
+        websocket.send_blocked = True
+
+        for serial in range(3):
+            self.transport.send_nowait({'msgSerial': serial})
+        await asyncio.sleep(0)
+
+        # The first message is stuck in websocket.send(), the others are still on the writer queue
+        await self.transport.dispose()
+        self.transport.send_nowait({'msgSerial': 3})
+
+        assert self.queued_messages() == [{'msgSerial': 1}, {'msgSerial': 2}, {'msgSerial': 3}]
+
+    async def test_connected_on_disposed_transport(self):
+        realtime = AblyRealtime('api:key', auto_connect=False)
+        connection_manager = realtime.connection.connection_manager
+        transport = WebSocketTransport(connection_manager, 'example.com', {})
+        await transport.dispose()
+        connection_manager.transport = transport
+        connection_manager.queued_messages.put({'action': ProtocolMessageAction.ATTACH, 'channel': 'channel'})
+
+        # The disposed transport hands the message straight back, which must not keep the drain going
+        connection_manager.notify_state(ConnectionState.CONNECTED)
+
+        assert connection_manager.queued_messages.qsize() == 1
+        connection_manager.transport = None
+        await realtime.close()